@@ -0,0 +1 @@
+# 저장소 루트를 sys.path에 추가하여 tests/에서 utils를 import 할 수 있도록 함
@@ -0,0 +1,130 @@
+import time
+
+import pandas as pd
+import pytest
+
+import utils
+
+
+class StubResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+        self.headers = headers or {}
+
+
+class StubSession:
+    """
+    _CLOVA_SESSION 대체용. 호출 횟수를 기록하고 고정 응답 반환.
+    """
+
+    def __init__(self, status_code, content=b"error", delay=0.0):
+        self.status_code = status_code
+        self.content = content
+        self.delay = delay
+        self.posts = 0
+
+    def post(self, *args, **kwargs):
+        self.posts += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return StubResponse(self.status_code, self.content)
+
+
+SUCCESS_BODY = '{"result": {"message": {"content": "{\\"요약\\": \\"s\\", \\"분류\\": \\"p\\", \\"근거\\": \\"r\\"}"}}}'.encode()
+
+
+def make_df(n, category="c"):
+    return pd.DataFrame({
+        "docid": range(n),
+        "category": category,
+        "title": "t",
+        "link": "l",
+        "content": "x",
+        "len_context": 1,
+        "label": "a",
+    })
+
+
+@pytest.fixture(autouse=True)
+def breaker(monkeypatch):
+    breaker = utils.CircuitBreaker()
+    monkeypatch.setattr(utils, "_CLOVA_BREAKER", breaker)
+    return breaker
+
+
+def test_circuit_breaker_opens_and_probes_half_open():
+    breaker = utils.CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()  # half-open 시험 호출
+    assert not breaker.allow_request()  # 시험 호출은 1회만 허용
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker._current_timeout == pytest.approx(0.1)
+
+    time.sleep(0.11)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert not breaker.is_open()
+
+
+def test_process_dataframe_fails_fast_while_circuit_open(monkeypatch, breaker):
+    session = StubSession(500)
+    monkeypatch.setattr(utils, "_CLOVA_SESSION", session)
+    monkeypatch.setattr(utils, "backoff_delay", lambda attempt: 0.01)
+
+    start = time.monotonic()
+    result_df, errors_df = utils.process_dataframe(make_df(20), "c", "P", "k", "k", rate_limit=1, rate_period=0.5)
+    elapsed = time.monotonic() - start
+
+    # failure_threshold(5) 초과 시 열린 뒤에는 limiter를 기다리지 않아야 함
+    assert session.posts == breaker.failure_threshold + 1
+    assert elapsed < (breaker.failure_threshold + 1) * 0.5 + 1.5
+    assert result_df.empty
+    assert len(errors_df) == 20
+    assert (errors_df["errors"] == utils.CIRCUIT_OPEN_ERROR).any()
+
+
+def test_iter_chunks_close_stops_api_calls(monkeypatch):
+    session = StubSession(200, SUCCESS_BODY, delay=0.02)
+    monkeypatch.setattr(utils, "_CLOVA_SESSION", session)
+
+    chunks = utils.iter_chunks(make_df(40), "c", "P", "k", "k", concurrency=4, rate_limit=1000, rate_period=1, proc_chunk_size=2)
+    result_df, _ = next(chunks)
+    chunks.close()
+
+    posts_at_close = session.posts
+    time.sleep(0.5)
+
+    assert len(result_df) == 2
+    assert posts_at_close < 40
+    assert session.posts == posts_at_close
+
+
+def test_retry_failed_rows_paces_429_with_growing_backoff(monkeypatch):
+    session = StubSession(429, b"too many requests")
+    monkeypatch.setattr(utils, "_CLOVA_SESSION", session)
+    sleeps = []
+    monkeypatch.setattr(utils.time, "sleep", sleeps.append)
+
+    errors_df = pd.DataFrame({"docid": range(2), "category": "c", "errors": "x"})
+    result_df, new_errors_df, _ = utils.retry_failed_rows(
+        errors_df, make_df(2), pd.DataFrame(columns=["docid"]), {"c": "P"}, "k", "k", max_retries=3
+    )
+
+    # 행마다 재처리 회차당 1회만 호출 (내부 재시도 없음)
+    assert session.posts == 2 * 3
+    assert len(sleeps) == 2 * 3
+    # 실패 시 대기는 성공 시 요청 간격(6초) 이상
+    assert min(sleeps) >= 6
+    assert len(new_errors_df) == 2
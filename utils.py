@@ -1,11 +1,174 @@
 import requests
+import requests_cache
+import aiohttp
+import asyncio
+from aiolimiter import AsyncLimiter
 import pandas as pd
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from tqdm import tqdm
-import json
+from tqdm.asyncio import tqdm as atqdm
+from requests.adapters import HTTPAdapter
+import orjson
+import os
+import queue
+import random
+import threading
 import time
 
+# 요청 타임아웃 (초): (연결, 읽기). p95 응답 시간보다 약간 크게 조정
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 27
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# 재시도 백오프 설정 (초)
+BACKOFF_BASE = 2
+BACKOFF_MAX_DELAY = 60
+CLOVA_MAX_ATTEMPTS = 3
+
+class CircuitBreaker:
+    """
+    연속 실패 시 호출을 차단하는 서킷 브레이커.
+
+    closed: 정상 호출, failure_threshold 회 초과 연속 실패 시 open
+    open: reset_timeout 초 동안 호출 차단 후 half-open
+    half-open: 1회 시험 호출 허용, 성공 시 closed / 실패 시 대기 시간을 두 배로 늘려 다시 open
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, max_reset_timeout=600):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = "closed"
+        self.failure_count = 0
+        self._current_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        # 상태를 바꾸지 않는 사전 확인용. 차단 중(open 대기 시간 내 또는 half-open 시험 호출 진행 중)이면 True
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self._opened_at < self._current_timeout
+            return self.state == "half-open" and self._probe_in_flight
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self._current_timeout:
+                    return False
+                self.state = "half-open"
+                self._probe_in_flight = False
+
+            if self.state == "half-open":
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failure_count = 0
+            self._current_timeout = self.reset_timeout
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == "half-open":
+                self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+                self._open()
+                return
+
+            self.failure_count += 1
+            if self.state == "closed" and self.failure_count > self.failure_threshold:
+                self._open()
+
+    def record_timeout(self):
+        # 일시적 오류로 보고 연속 실패로 집계하지 않음. 단, half-open 시험 호출의 타임아웃은 실패로 처리
+        with self._lock:
+            if self.state == "half-open":
+                self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+_CLOVA_BREAKER = CircuitBreaker()
+CIRCUIT_OPEN_ERROR = "circuit open"
+
+# 커넥션 풀 크기 (Clova API와 기사 수집은 서로 다른 풀을 사용하여 장애 전파를 차단)
+CLOVA_POOL_SIZE = 16
+SCRAPE_POOL_SIZE = 16
+
+def _make_session(pool_size, session=None):
+    session = session if session is not None else requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Clova API 호출용 세션 및 워커 스레드 (keep-alive로 TCP/TLS 연결 재사용)
+_CLOVA_SESSION = _make_session(CLOVA_POOL_SIZE)
+_CLOVA_EXECUTOR = ThreadPoolExecutor(max_workers=CLOVA_POOL_SIZE, thread_name_prefix='clova')
+
+def _clova_headers(api_key, apigw_api_key):
+    return {
+        'X-NCP-CLOVASTUDIO-API-KEY': api_key,
+        'X-NCP-APIGW-API-KEY': apigw_api_key,
+        'Content-Type': 'application/json',
+    }
+
+def _run_coroutine(coro):
+    """
+    코루틴 실행 헬퍼. 이미 이벤트 루프가 실행 중인 경우(Jupyter 등) 별도 스레드에서 실행.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+# 기사 본문 태그만 파싱 (페이지 나머지 요소는 트리에 올리지 않음)
+# class 속성에 다른 클래스가 함께 있는 경우(예: "editor-p big")도 포함
+_ARTICLE_STRAINER = SoupStrainer('p', attrs={'class': lambda c: c and 'editor-p' in c.split()})
+
+def _parse_article(body):
+    """
+    기사 HTML에서 본문 추출.
+    """
+    soup = BeautifulSoup(body, 'lxml', parse_only=_ARTICLE_STRAINER)
+    content = " ".join([p.get_text(strip=True) for p in soup.find_all('p')])
+    return (content, len(content)) if content else ("Content not found", 0)
+
+# 기사 수집 HTTP 캐시 (sqlite). 재실행 시 캐시 응답 사용, 원본 오류 시 만료된 캐시로 대체
+# 캐시 파일 경로: SCRAPE_CACHE_PATH 환경 변수 (기본값: 현재 디렉터리의 scrape_cache.sqlite)
+SCRAPE_CACHE_NAME = os.environ.get('SCRAPE_CACHE_PATH', 'scrape_cache')
+SCRAPE_CACHE_EXPIRE = 86400
+
+# 기사 수집용 공유 세션 (처음 사용할 때 한 번만 생성하여 모든 워커 스레드가 재사용)
+_scrape_session_instance = None
+_scrape_session_lock = threading.Lock()
+
+def _scrape_session():
+    global _scrape_session_instance
+    with _scrape_session_lock:
+        if _scrape_session_instance is None:
+            _scrape_session_instance = _make_session(SCRAPE_POOL_SIZE, requests_cache.CachedSession(
+                SCRAPE_CACHE_NAME,
+                expire_after=SCRAPE_CACHE_EXPIRE,
+                stale_if_error=True,
+            ))
+        return _scrape_session_instance
+
 def fetch_article_content(url):
     """
     한국일보 뉴스 url로 부터 기사 수집.
@@ -15,31 +178,156 @@ def fetch_article_content(url):
         df['content'], df['len_context'] = zip(*df['link'].progress_apply(fetch_article_content))
     """
     try:
-        response = requests.get(url)
+        return _fetch_article(url)
+    except Exception as e:
+        return f"Error fetching content: {e}", 0
+
+@lru_cache(maxsize=10000)
+def _fetch_article(url):
+    # 예외는 캐시되지 않으므로 실패한 url은 다음 호출 시 다시 수집
+    response = _scrape_session().get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    if getattr(response, 'is_expired', False):
+        print(f"Warning: serving stale cached content for {url}")
+    return _parse_article(response.content)
+
+def fetch_articles(urls, max_workers=SCRAPE_POOL_SIZE):
+    """
+    여러 기사 url을 스레드 풀로 동시 수집 (aiohttp 없이 requests 사용).
+
+    파라미터:
+        urls: 수집할 기사 url 리스트
+        max_workers: 워커 스레드 수 (최대 SCRAPE_POOL_SIZE)
+
+    리턴:
+        (content, len_content) 튜플 리스트 (urls 순서 유지)
+
+    사용 예시:
+        df['content'], df['len_context'] = zip(*fetch_articles(df['link']))
+    """
+    # 공유 세션의 커넥션 풀 크기를 넘지 않도록 동시 수집 수 제한
+    with ThreadPoolExecutor(max_workers=min(max_workers, SCRAPE_POOL_SIZE)) as executor:
+        return list(tqdm(executor.map(fetch_article_content, urls), total=len(urls), desc="Fetching articles"))
+
+async def _fetch(session, url):
+    async with session.get(url, timeout=aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)) as response:
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        paragraphs = soup.find_all('p', {'class': 'editor-p'})
-        content = " ".join([p.get_text(strip=True) for p in paragraphs])
-        return content, len(content) if content else ("Content not found", 0)
+        return await response.read()
+
+async def _fetch_article_content_async(session, url, semaphore):
+    try:
+        async with semaphore:
+            body = await _fetch(session, url)
+        # 파싱은 executor에서 수행하여 다음 다운로드와 겹치도록 처리
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _parse_article, body)
     except Exception as e:
         return f"Error fetching content: {e}", 0
 
+async def _fetch_all(urls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        tasks = [_fetch_article_content_async(session, url, semaphore) for url in urls]
+        return await atqdm.gather(*tasks, desc="Fetching articles")
+
+def fetch_all(urls, concurrency=10):
+    """
+    여러 기사 url을 비동기로 동시 수집.
+
+    requests 세션을 쓰지 않으므로 fetch_article_content()/fetch_articles()의 기사 수집 커넥션 풀과
+    HTTP 캐시(lru_cache, requests_cache)를 거치지 않음. 동시 요청 수만 SCRAPE_POOL_SIZE 이하로 제한.
+
+    파라미터:
+        urls: 수집할 기사 url 리스트
+        concurrency: 동시 요청 수 (최대 SCRAPE_POOL_SIZE)
+
+    리턴:
+        (content, len_content) 튜플 리스트 (urls 순서 유지)
+
+    사용 예시:
+        df['content'], df['len_context'] = zip(*fetch_all(df['link'].tolist()))
+    """
+    return _run_coroutine(_fetch_all(urls, min(concurrency, SCRAPE_POOL_SIZE)))
+
+# 원본 기사 데이터에서 사용하는 컬럼
+ARTICLE_COLUMNS = ['docid', 'category', 'title', 'link', 'content', 'len_context', 'label']
+
+# category dtype으로 변환할 저카디널리티 컬럼
+_CATEGORICAL_COLUMNS = ['category', 'label', 'pred', 'error_stage']
+_UNSIGNED_COLUMNS = ['len_content', 'len_context']
+
+def _optimize(df):
+    """
+    메모리 절감을 위한 dtype 변환 (저카디널리티 문자열 -> category, 길이 컬럼 -> unsigned 다운캐스트).
+    """
+    for col in _CATEGORICAL_COLUMNS:
+        # 값의 타입이 섞인 컬럼(리스트/딕셔너리 포함)은 category 변환 및 parquet 저장이 실패하므로 그대로 둠
+        if col in df.columns and not pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+            df[col] = df[col].astype('category')
+    for col in _UNSIGNED_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='unsigned')
+    return df
+
+def load_articles(path, usecols=ARTICLE_COLUMNS):
+    """
+    기사 데이터 CSV 로드. 필요한 컬럼만 읽고 dtype을 최적화.
+
+    사용 예시:
+        df = load_articles('articles.csv')
+    """
+    return _optimize(pd.read_csv(path, usecols=usecols))
+
+def save_dataframe(df, filename, csv=False):
+    """
+    데이터 프레임을 parquet(zstd 압축)으로 저장. csv=True 이면 확인용 CSV도 함께 저장.
+
+    파라미터:
+        df: 저장할 데이터 프레임
+        filename: 확장자를 제외한 파일 이름
+        csv: CSV 파일 추가 저장 여부
+
+    리턴:
+        저장된 parquet 파일 경로
+
+    사용 예시:
+        save_dataframe(final_result_df, f'final_result_df_{current_time}')
+
+        # content 컬럼 없이 필요한 컬럼만 읽기
+        pd.read_parquet(f'final_result_df_{current_time}.parquet', columns=['docid', 'pred', 'reason'])
+    """
+    parquet_filename = f'{filename}.parquet'
+    df.to_parquet(parquet_filename, index=False, compression='zstd', row_group_size=50_000)
+    if csv:
+        df.to_csv(f'{filename}.csv', index=False)
+    return parquet_filename
+
+def _as_text(value):
+    """
+    LLM 응답 값을 문자열로 변환 (숫자/리스트 등이 섞이면 parquet 저장 및 category 변환이 실패하므로).
+    """
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return ""
+    return orjson.dumps(value).decode()
+
 def process_response_content(result_content):
     """
     LLM 응답 형식이 JSON 포멧인지 확인 및 처리.
     """
     try:
         # JSON 포맷으로 처리
-        parsed_content = json.loads(result_content)
+        parsed_content = orjson.loads(result_content)
         summary = parsed_content.get("요약", "")
         pred = parsed_content.get("분류", "")
         reason = parsed_content.get("근거", "")
         return summary, pred, reason
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         # JSON 디코딩 에러 발생 시
         raise ValueError("Unexpected content format: Not a valid JSON")
     
-def process_dataframe(df, category, prompt, api_key, apigw_api_key):
+def process_dataframe(df, category, prompt, api_key, apigw_api_key, concurrency=2, rate_limit=1, rate_period=6, proc_chunk_size=500, shard_dir=None):
     """
     배치 처리를 위한 데이터 처리 함수:
 
@@ -49,11 +337,20 @@ def process_dataframe(df, category, prompt, api_key, apigw_api_key):
         prompt: 프롬프트
         api_key: API 호출에 사용할 API 키
         apigw_api_key: API Gateway 호출에 사용할 API 키
+        concurrency: 동시에 처리할 최대 요청 수
+        rate_limit: rate_period 초 동안 허용되는 최대 API 호출 수
+        rate_period: rate_limit 적용 구간 (초)
+        proc_chunk_size: 청크(샤드) 하나에 모을 결과 행 수
+        shard_dir: 지정 시 청크 결과를 parquet 샤드로 기록하는 디렉터리 (체크포인트 용도).
+            처리 중에는 결과를 샤드로만 보관하고, 종료 시 샤드를 읽어 result_df를 만듦
 
     리턴:
         result_df: 결과 데이터 프레임
         errors_df: 오류 로그 
 
+    result_df는 카테고리 전체 결과를 담으므로 메모리 사용량은 결과 행 수에 비례.
+    결과 전체를 메모리에 모으지 않고 청크 단위로 처리하려면 iter_chunks() 사용.
+
     사용 예시:
         prompts = {
         "난이도": prompt_1,
@@ -82,83 +379,253 @@ def process_dataframe(df, category, prompt, api_key, apigw_api_key):
 
         # 최종 결과 및 에러 데이터프레임 저장
         current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-        final_result_filename = f'final_result_df_{current_time}.csv'
-        final_errors_filename = f'final_errors_df_{current_time}.csv'
-        final_result_df.to_csv(final_result_filename, index=False)
-        final_errors_df.to_csv(final_errors_filename, index=False)
+        final_result_filename = save_dataframe(final_result_df, f'final_result_df_{current_time}')
+        final_errors_filename = save_dataframe(final_errors_df, f'final_errors_df_{current_time}')
 
         print(f"All categories processed and results saved as {final_result_filename} and {final_errors_filename}.")
     """
+    result_chunks = []
+    result_shards = []
+    errors_chunks = []
+
+    # shard_dir 지정 시 완료된 청크를 parquet 샤드로만 기록 (처리 중에는 결과를 메모리에 쌓지 않고, 중단 시에도 결과 보존)
+    if shard_dir is not None:
+        os.makedirs(shard_dir, exist_ok=True)
+
+    for i, (chunk_result_df, chunk_errors_df) in enumerate(iter_chunks(df, category, prompt, api_key, apigw_api_key, concurrency, rate_limit, rate_period, proc_chunk_size)):
+        if shard_dir is None:
+            result_chunks.append(chunk_result_df)
+        elif not chunk_result_df.empty:
+            shard_path = os.path.join(shard_dir, f"result_{category}_{i}.parquet")
+            chunk_result_df.to_parquet(shard_path, index=False, compression='zstd')
+            result_shards.append(shard_path)
+        errors_chunks.append(chunk_errors_df)
+
+    # 반환할 result_df는 전체 결과를 담으므로 이 시점의 메모리 사용량은 결과 크기에 비례
+    if result_shards:
+        result_chunks = [pd.read_parquet(f) for f in result_shards]
+    result_df = pd.concat(result_chunks, ignore_index=True) if result_chunks else pd.DataFrame()
+
+    # 청크는 완료 순서로 반환되므로 docid 순서로 정렬
+    if not result_df.empty:
+        result_df = result_df.sort_values('docid', kind='stable').reset_index(drop=True)
+
+    errors_df = pd.concat(errors_chunks, ignore_index=True) if errors_chunks else pd.DataFrame()
+
+    return _optimize(result_df), _optimize(errors_df)
+
+# iter_chunks()에서 소비되지 않고 대기할 수 있는 최대 청크 수
+ITER_CHUNKS_QUEUE_SIZE = 2
+
+def iter_chunks(df, category, prompt, api_key, apigw_api_key, concurrency=2, rate_limit=1, rate_period=6, proc_chunk_size=500):
+    """
+    process_dataframe()의 청크 단위 제너레이터. 완료된 순서대로 결과가 proc_chunk_size 행 모일 때마다 (result_df, errors_df) 반환.
+    응답이 늦은 행이 있어도 나머지 완료된 행은 먼저 반환되므로 행 순서는 보장하지 않음.
+
+    사용 예시:
+        for chunk_result_df, chunk_errors_df in iter_chunks(df, category, prompt, api_key, apigw_api_key):
+            chunk_result_df.to_parquet(...)
+    """
     df_filtered = df[df['category'] == category]
+    rows = list(df_filtered.itertuples(index=False))
+
+    # 이벤트 루프는 별도 스레드에서 실행하고, 완료된 청크는 크기 제한 큐로 전달 (소비가 느리면 처리도 대기)
+    chunks = queue.Queue(maxsize=ITER_CHUNKS_QUEUE_SIZE)
+    finished = object()
+    stop = threading.Event()
+    started = threading.Event()
+    state = {}
+
+    def put(item):
+        # 소비자가 중단한 경우 큐가 가득 차 있어도 멈추지 않도록 stop 확인
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    async def flush(results, errors):
+        # 큐가 가득 찬 동안 이벤트 루프가 멈추지 않도록 대기는 별도 스레드에서 수행
+        item = (pd.DataFrame(results), pd.DataFrame(errors))
+        await asyncio.get_running_loop().run_in_executor(None, put, item)
+
+    async def main():
+        state['loop'] = asyncio.get_running_loop()
+        state['task'] = asyncio.current_task()
+        started.set()
+        await _process_rows(rows, category, prompt, api_key, apigw_api_key, concurrency, rate_limit, rate_period, proc_chunk_size, flush)
+
+    def run():
+        try:
+            asyncio.run(main())
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            put(e)
+        finally:
+            started.set()
+            put(finished)
+
+    def cancel():
+        stop.set()
+        started.wait()
+        loop = state.get('loop')
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(state['task'].cancel)
+            except RuntimeError:
+                # 이미 종료된 이벤트 루프
+                pass
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+
+    try:
+        while True:
+            item = chunks.get()
+            if item is finished:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # 소비자가 중간에 멈춘 경우(break, 예외, KeyboardInterrupt) 남은 API 호출 취소
+        cancel()
+        worker.join()
+
+async def _process_rows(rows, category, prompt, api_key, apigw_api_key, concurrency, rate_limit, rate_period, proc_chunk_size, flush):
+    limiter = AsyncLimiter(rate_limit, rate_period)
+
+    # concurrency 개의 워커가 행을 하나씩 가져가 처리. 완료된 행은 크기 제한 큐로 전달되므로
+    # 처리 중인 행과 아직 소비되지 않은 결과만 메모리에 유지
+    pending = iter(rows)
+    outcomes = asyncio.Queue(maxsize=concurrency)
+
+    async def worker():
+        for row in pending:
+            await outcomes.put(await _process_row_async(row, category, prompt, api_key, apigw_api_key, limiter))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(rows)))]
 
     results = []
     errors = []
 
-    for _, row in tqdm(df_filtered.iterrows(), total=len(df_filtered), desc=f"Processing {category} rows"):
-        try:
-            context = row['content']
-            len_context = row['len_context']
+    try:
+        with tqdm(total=len(rows), desc=f"Processing {category} rows") as progress:
+            for _ in range(len(rows)):
+                success, data = await outcomes.get()
+                progress.update(1)
+                (results if success else errors).append(data)
+
+                if len(results) >= proc_chunk_size:
+                    await flush(results, errors)
+                    results = []
+                    errors = []
+
+        if results or errors:
+            await flush(results, errors)
+    finally:
+        # 취소 시 아직 시작하지 않은 행이 API를 호출하지 않도록 워커 정리
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+async def _process_row_async(row, category, prompt, api_key, apigw_api_key, limiter):
+    try:
+        loop = asyncio.get_running_loop()
 
-            # len_context 절삭
-            if len_context > 6500:
-                context = context[:6500]
+        # 재시도도 매번 limiter 토큰을 소비하도록 호출 1회 단위로 처리
+        for attempt in range(CLOVA_MAX_ATTEMPTS):
+            # 브레이커가 열려 있으면 limiter 토큰을 기다리지 않고 바로 실패 처리.
+            # limiter 대기 중에 브레이커가 열릴 수 있으므로 토큰 획득 직후에도 다시 확인
+            if _CLOVA_BREAKER.is_open():
+                raise Exception(CIRCUIT_OPEN_ERROR)
 
-            messages = [
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": context},
-            ]
+            async with limiter:
+                if _CLOVA_BREAKER.is_open():
+                    raise Exception(CIRCUIT_OPEN_ERROR)
 
-            # API 호출
-            response_json, error = call_clova_api(api_key, apigw_api_key, messages)
+                success, data, retryable, retry_after = await loop.run_in_executor(_CLOVA_EXECUTOR, _process_row, row, category, prompt, api_key, apigw_api_key)
 
-            if error:
-                raise Exception(error)
+            if success or not retryable or attempt == CLOVA_MAX_ATTEMPTS - 1:
+                return success, data
 
-            # result와 message 필드가 예상대로 있는지 확인
-            if 'result' not in response_json or 'message' not in response_json['result']:
-                raise Exception("Unexpected response format: 'result' or 'message' key missing")
+            await asyncio.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+    except Exception as e:
+        return False, {
+            "docid": row.docid,
+            "category": category,
+            "errors": str(e),
+            "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+        }
 
-            result_content = response_json['result']['message'].get('content', '')
+def _process_row(row, category, prompt, api_key, apigw_api_key):
+    """
+    process_dataframe()의 단일 행 처리 (API 호출 1회).
 
-            # 응답 내용을 처리하여 summary, pred, reason 추출
-            try:
-                summary, pred, reason = process_response_content(result_content)
-            except ValueError as ve:
-                # JSON 형식이 아닌 경우 에러 처리
-                raise Exception(f"Failed to process content for docid {row['docid']} in {category} - {str(ve)}")
-
-            # 결과를 데이터 프레임에 저장
-            results.append({
-                "docid": row['docid'],
-                "category": category,
-                "title": row['title'],
-                "link": row['link'],
-                "content": row['content'],
-                "len_content": len_context,
-                "label": row['label'],
-                "pred": pred,
-                "reason": reason,
-                "summary": summary
-            })
-
-            print(f"Success: docid {row['docid']} in {category} 처리 완료")
+    리턴:
+        (success, 결과 dict 또는 오류 dict, retryable, retry_after)
+    """
+    retryable, retry_after = False, None
 
-        except Exception as e:
-            errors.append({
-                "docid": row['docid'],
-                "category": category,
-                "errors": str(e),
-                "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
-            })
+    try:
+        context = row.content
+        len_context = row.len_context
+
+        # len_context 절삭
+        if len_context > 6500:
+            context = context[:6500]
+
+        messages = [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": context},
+        ]
 
-            print(f"Error: docid {row['docid']} in {category} 처리 실패 - {str(e)}")
+        # API 호출
+        response_json, error, retryable, retry_after = _request_clova_api(api_key, apigw_api_key, messages, max_attempts=1)
 
-        time.sleep(6)
+        if error:
+            raise Exception(error)
 
-    result_df = pd.DataFrame(results)
-    errors_df = pd.DataFrame(errors)
+        # result와 message 필드가 예상대로 있는지 확인
+        if 'result' not in response_json or 'message' not in response_json['result']:
+            raise Exception("Unexpected response format: 'result' or 'message' key missing")
 
-    return result_df, errors_df
+        result_content = response_json['result']['message'].get('content', '')
+
+        # 응답 내용을 처리하여 summary, pred, reason 추출
+        try:
+            summary, pred, reason = process_response_content(result_content)
+        except ValueError as ve:
+            # JSON 형식이 아닌 경우 에러 처리
+            raise Exception(f"Failed to process content for docid {row.docid} in {category} - {str(ve)}")
+
+        print(f"Success: docid {row.docid} in {category} 처리 완료")
+
+        # 결과를 데이터 프레임에 저장
+        return True, {
+            "docid": row.docid,
+            "category": category,
+            "title": row.title,
+            "link": row.link,
+            "content": row.content,
+            "len_content": len_context,
+            "label": row.label,
+            "pred": _as_text(pred),
+            "reason": _as_text(reason),
+            "summary": _as_text(summary)
+        }, False, None
+
+    except Exception as e:
+        print(f"Error: docid {row.docid} in {category} 처리 실패 - {str(e)}")
+
+        return False, {
+            "docid": row.docid,
+            "category": category,
+            "errors": str(e),
+            "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+        }, retryable, retry_after
 
 def retry_failed_rows(errors_df, df, result_df, prompts, api_key, apigw_api_key, max_retries=3):
     """
@@ -188,21 +655,24 @@ def retry_failed_rows(errors_df, df, result_df, prompts, api_key, apigw_api_key,
 
         # 재처리 후 결과와 로그 저장
         current_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-        final_result_filename = f'final_result_df_after_retry_{current_time}.csv'
-        final_errors_filename = f'final_errors_df_after_retry_{current_time}.csv'
-        retry_logs_filename = f'retry_logs_{current_time}.csv'
-
-        final_result_df.to_csv(final_result_filename, index=False)
-        final_errors_df.to_csv(final_errors_filename, index=False)
-        retry_logs_df.to_csv(retry_logs_filename, index=False)
+        final_result_filename = save_dataframe(final_result_df, f'final_result_df_after_retry_{current_time}')
+        final_errors_filename = save_dataframe(final_errors_df, f'final_errors_df_after_retry_{current_time}')
+        retry_logs_filename = save_dataframe(retry_logs_df, f'retry_logs_{current_time}')
 
         print(f"Retry processing complete. Results saved as {final_result_filename}, {final_errors_filename}, and {retry_logs_filename}.")
     """
     retry_count = 0
-    retry_wait_time = 6
+    request_interval = 6
 
-    # 전체 로그를 유지하기 위한 리스트 초기화
+    # 전체 로그 및 재처리 성공 결과를 유지하기 위한 리스트 초기화
     all_logs = []
+    retry_successes = []
+
+    # (docid, category) -> 원본 행 조회용 인덱스 (중복 시 첫 번째 행 사용)
+    df_index = {
+        (row.docid, row.category): row
+        for row in df.drop_duplicates(['docid', 'category']).itertuples(index=False)
+    }
 
     while not errors_df.empty and retry_count < max_retries:
         retry_count += 1
@@ -211,70 +681,78 @@ def retry_failed_rows(errors_df, df, result_df, prompts, api_key, apigw_api_key,
         current_attempt_logs = []
         new_errors = []
 
-        for _, error_row in tqdm(errors_df.iterrows(), total=len(errors_df), desc=f"Retrying attempt {retry_count}"):
+        for error_row in tqdm(errors_df.itertuples(index=False), total=len(errors_df), desc=f"Retrying attempt {retry_count}"):
+            wait_time = None
+            # 행마다 한 번만 포맷하여 로그 전체에 재사용
+            row_time = datetime.now().strftime('%Y%m%d %H:%M:%S')
+
             try:
                 # 원본 df에서 해당 행 찾기
-                matching_rows = df[(df['docid'] == error_row['docid']) & (df['category'] == error_row['category'])]
+                row = df_index.get((error_row.docid, error_row.category))
 
-                if matching_rows.empty:
-                    log_message = f"No matching row found for docid {error_row['docid']} and category {error_row['category']}"
+                if row is None:
+                    log_message = f"No matching row found for docid {error_row.docid} and category {error_row.category}"
                     print(log_message)
                     current_attempt_logs.append({
-                        "docid": error_row['docid'],
-                        "category": error_row['category'],
+                        "docid": error_row.docid,
+                        "category": error_row.category,
                         "status": "Error",
                         "error_stage": "Retry",
                         "message": log_message,
-                        "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+                        "time": row_time
                     })
                     new_errors.append({
-                        "docid": error_row['docid'],
-                        "category": error_row['category'],
+                        "docid": error_row.docid,
+                        "category": error_row.category,
                         "errors": log_message,
                         "error_stage": "Retry",
-                        "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+                        "time": row_time
                     })
                     continue
 
-                row = matching_rows.iloc[0]
-                context = row['content']
-                len_context = row['len_context']
+                context = row.content
+                len_context = row.len_context
 
                 if len_context > 6500:
                     context = context[:6500]
 
                 messages = [
-                    {"role": "system", "content": prompts[row['category']]},
+                    {"role": "system", "content": prompts[row.category]},
                     {"role": "user", "content": context},
                 ]
 
-                response_json, error = call_clova_api(api_key, apigw_api_key, messages)
+                # 재시도 간격은 아래의 행 단위 백오프로만 조절 (내부 재시도 없이 1회 호출)
+                response_json, error, _, retry_after = _request_clova_api(api_key, apigw_api_key, messages, max_attempts=1)
 
                 if error:
                     if '429' in error:
-                        log_message = f"429 Too Many Requests: Waiting for {retry_wait_time} seconds before retrying..."
+                        wait_time = max(request_interval, retry_after) if retry_after is not None else request_interval + backoff_delay(retry_count - 1)
+                        log_message = f"429 Too Many Requests: Waiting for {wait_time:.1f} seconds before retrying..."
                         print(log_message)
-                        time.sleep(retry_wait_time)
                         raise Exception("API 호출 실패: 429, Too Many Requests")
                     elif '40005' in error or '40006' in error:
-                        log_message = f"Skipping retry for docid {error_row['docid']} in {error_row['category']} due to policy issue: {error}"
+                        log_message = f"Skipping retry for docid {error_row.docid} in {error_row.category} due to policy issue: {error}"
                         print(log_message)
                         current_attempt_logs.append({
-                            "docid": error_row['docid'],
-                            "category": error_row['category'],
+                            "docid": error_row.docid,
+                            "category": error_row.category,
                             "status": "Error",
                             "error_stage": "Retry",
                             "message": log_message,
-                            "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+                            "time": row_time
                         })
                         new_errors.append({
-                            "docid": error_row['docid'],
-                            "category": error_row['category'],
+                            "docid": error_row.docid,
+                            "category": error_row.category,
                             "errors": error,
                             "error_stage": "Retry",
-                            "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+                            "time": row_time
                         })
                         continue
+                    elif error == CIRCUIT_OPEN_ERROR:
+                        # 브레이커가 열린 동안은 호출이 없으므로 대기 없이 다음 행으로 진행
+                        wait_time = 0
+                        raise Exception(error)
                     else:
                         raise Exception(error)
 
@@ -292,62 +770,54 @@ def retry_failed_rows(errors_df, df, result_df, prompts, api_key, apigw_api_key,
                 # 응답 내용을 처리하여 summary, pred, reason 추출
                 summary, pred, reason = process_response_content(result_content)
 
-                # 성공 시 결과를 result_df에 추가 (docid 순서 유지)
-                result_data = {
-                    "docid": row['docid'],
-                    "category": row['category'],
-                    "title": row['title'],
-                    "link": row['link'],
-                    "content": row['content'],
+                # 성공 시 결과를 모아 두었다가 루프 종료 후 result_df에 일괄 추가
+                retry_successes.append({
+                    "docid": row.docid,
+                    "category": row.category,
+                    "title": row.title,
+                    "link": row.link,
+                    "content": row.content,
                     "len_content": len_context,
-                    "label": row['label'],
-                    "pred": pred,
-                    "reason": reason,
-                    "summary": summary
-                }
-
-                # 적절한 위치에 삽입
-                original_index = result_df[result_df['docid'] < row['docid']].index.max() + 1
-                if pd.isna(original_index):  # 첫 번째 위치에 삽입하는 경우
-                    original_index = 0
-
-                result_df = pd.concat([
-                    result_df.iloc[:original_index],  # 기존 데이터프레임에서 해당 위치까지
-                    pd.DataFrame([result_data]),      # 새롭게 추가할 데이터
-                    result_df.iloc[original_index:]   # 해당 위치 이후의 데이터
-                ]).reset_index(drop=True)
-
-                log_message = f"Success on retry: docid {row['docid']} in {row['category']} 처리 완료"
+                    "label": row.label,
+                    "pred": _as_text(pred),
+                    "reason": _as_text(reason),
+                    "summary": _as_text(summary)
+                })
+
+                log_message = f"Success on retry: docid {row.docid} in {row.category} 처리 완료"
                 print(log_message)
                 current_attempt_logs.append({
-                    "docid": row['docid'],
-                    "category": row['category'],
+                    "docid": row.docid,
+                    "category": row.category,
                     "status": "Success",
                     "error_stage": "Retry",
                     "message": log_message,
-                    "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+                    "time": row_time
                 })
 
             except Exception as e:
-                log_message = f"Error on retry: docid {error_row['docid']} in {error_row['category']} 처리 실패 - {str(e)}"
+                if wait_time is None:
+                    wait_time = request_interval + backoff_delay(retry_count - 1)
+                log_message = f"Error on retry: docid {error_row.docid} in {error_row.category} 처리 실패 - {str(e)}"
                 new_errors.append({
-                    "docid": error_row['docid'],
-                    "category": error_row['category'],
+                    "docid": error_row.docid,
+                    "category": error_row.category,
                     "errors": str(e),
                     "error_stage": "Retry",
-                    "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+                    "time": row_time
                 })
                 print(log_message)
                 current_attempt_logs.append({
-                    "docid": error_row['docid'],
-                    "category": error_row['category'],
+                    "docid": error_row.docid,
+                    "category": error_row.category,
                     "status": "Error",
                     "error_stage": "Retry",
                     "message": log_message,
-                    "time": datetime.now().strftime('%Y%m%d %H:%M:%S')
+                    "time": row_time
                 })
 
-            time.sleep(retry_wait_time)
+            # 성공 시 요청 간격 유지, 실패 시 요청 간격에 백오프를 더해 대기
+            time.sleep(wait_time if wait_time is not None else request_interval)
 
         # 현재 시도에서의 로그를 전체 로그에 추가
         all_logs.extend(current_attempt_logs)
@@ -355,6 +825,11 @@ def retry_failed_rows(errors_df, df, result_df, prompts, api_key, apigw_api_key,
         # 새로운 오류로 errors_df 갱신
         errors_df = pd.DataFrame(new_errors).reset_index(drop=True)
 
+    # 재처리 성공 결과를 한 번에 병합하고 docid 순서로 정렬
+    if retry_successes:
+        result_df = pd.concat([result_df, pd.DataFrame(retry_successes)], ignore_index=True)
+        result_df = result_df.sort_values('docid', kind='stable').reset_index(drop=True)
+
     # 전체 로그를 데이터프레임으로 변환하여 반환
     logs_df = pd.DataFrame(all_logs)
 
@@ -399,7 +874,7 @@ def process_single_row(row, prompt, api_key, apigw_api_key):
         # JSON 형식인지 텍스트 형식인지 확인
         if result_content.startswith('{') and result_content.endswith('}'):
             # JSON 포맷으로 처리
-            parsed_content = json.loads(result_content)
+            parsed_content = orjson.loads(result_content)
             summary = parsed_content.get("요약", "")
             pred = parsed_content.get("분류", "")
             reason = parsed_content.get("근거", "")
@@ -434,20 +909,16 @@ def calculate_token_count(messages, api_key, apigw_api_key):
     """
     url = f'https://clovastudio.apigw.ntruss.com/v1/api-tools/chat-tokenize/HCX-003'
 
-    headers = {
-        'X-NCP-CLOVASTUDIO-API-KEY': api_key,
-        'X-NCP-APIGW-API-KEY': apigw_api_key,
-        'Content-Type': 'application/json'
-    }
+    headers = _clova_headers(api_key, apigw_api_key)
 
     data = {
         "messages": messages
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = _CLOVA_SESSION.post(url, headers=headers, data=orjson.dumps(data), timeout=REQUEST_TIMEOUT)
 
     if response.status_code == 200:
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         if response_data['status']['code'] == '20000':
             total_token_count = 0
             for message in response_data['result']['messages']:
@@ -458,48 +929,130 @@ def calculate_token_count(messages, api_key, apigw_api_key):
     else:
         return None
 
-def call_clova_api(api_key, apigw_api_key, messages):
+# ChatCompletion 요청 파라미터 (messages 제외). 직렬화된 본문 앞부분을 미리 만들어 재사용
+_CHAT_PARAMS = {
+    "topK": 0,
+    "includeAiFilters": True,
+    "maxTokens": 200,
+    "temperature": 0.25,
+    "repeatPenalty": 4,
+    "topP": 0.8
+}
+_CHAT_BODY_PREFIX = orjson.dumps(_CHAT_PARAMS)[:-1] + b',"messages":['
+
+@lru_cache(maxsize=None)
+def _system_fragment(prompt):
+    # 카테고리별 프롬프트는 반복 사용되므로 직렬화 결과를 캐시
+    return orjson.dumps({"role": "system", "content": prompt})
+
+def _build_chat_body(messages):
+    """
+    ChatCompletion 요청 본문(JSON bytes) 생성. system 메시지는 캐시된 직렬화 결과 사용.
+    """
+    fragments = [
+        _system_fragment(message["content"]) if message["role"] == "system" else orjson.dumps(message)
+        for message in messages
+    ]
+    return _CHAT_BODY_PREFIX + b','.join(fragments) + b']}'
+
+def call_clova_api(api_key, apigw_api_key, messages, max_attempts=CLOVA_MAX_ATTEMPTS):
     """
     HCX ChatCompletion API 함수.
+
+    429, 5xx 응답 및 요청 예외는 지수 백오프(jitter 포함)로 최대 max_attempts 회 시도.
+    5xx 및 연결 오류가 연속되면 서킷 브레이커가 열리고, 열린 동안은 호출 없이 (None, "circuit open") 반환.
+    """
+    response_json, error, _, _ = _request_clova_api(api_key, apigw_api_key, messages, max_attempts)
+    return response_json, error
+
+def _request_clova_api(api_key, apigw_api_key, messages, max_attempts=CLOVA_MAX_ATTEMPTS):
+    """
+    call_clova_api() 본체. 재시도 판단에 필요한 정보를 함께 반환.
+
+    리턴:
+        (response_json, error, retryable, retry_after)
+        retry_after: 마지막 응답의 Retry-After 헤더 값 (초), 없으면 None
     """
     url = 'https://clovastudio.stream.ntruss.com/testapp/v1/chat-completions/HCX-003'
 
-    headers = {
-        'X-NCP-CLOVASTUDIO-API-KEY': api_key,
-        'X-NCP-APIGW-API-KEY': apigw_api_key,
-        'Content-Type': 'application/json',
-    }
+    headers = _clova_headers(api_key, apigw_api_key)
 
-    data = {
-        "topK": 0,
-        "includeAiFilters": True,
-        "maxTokens": 200,
-        "temperature": 0.25,
-        "messages": messages,
-        "repeatPenalty": 4,
-        "topP": 0.8
-    }
+    body = _build_chat_body(messages)
 
+    for attempt in range(max_attempts):
+        if not _CLOVA_BREAKER.allow_request():
+            return None, CIRCUIT_OPEN_ERROR, False, None
+
+        response_json, error, retryable, retry_after = _post_clova_api(url, headers, body)
+
+        if not retryable or attempt == max_attempts - 1:
+            break
+
+        time.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+
+    return response_json, error, retryable, retry_after
+
+def _post_clova_api(url, headers, body):
+    """
+    _request_clova_api()의 단일 호출.
+
+    리턴:
+        (response_json, error, retryable, retry_after)
+    """
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = _CLOVA_SESSION.post(url, headers=headers, data=body, timeout=REQUEST_TIMEOUT)
+
+        # 5xx만 장애로 집계 (4xx 정책 오류 등은 행 단위 오류이므로 브레이커에 영향 없음)
+        if response.status_code >= 500:
+            _CLOVA_BREAKER.record_failure()
+        else:
+            _CLOVA_BREAKER.record_success()
 
         if response.status_code != 200:
-            return None, f"API 호출 실패: {response.status_code}, {response.text}"
+            retryable = response.status_code == 429 or response.status_code >= 500
+            retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+            return None, f"API 호출 실패: {response.status_code}, {response.text}", retryable, retry_after
 
         # 응답이 비어 있는지 확인
         if not response.text:
-            return None, "Empty response received"
+            return None, "Empty response received", False, None
 
         try:
-            response_json = response.json()
+            response_json = orjson.loads(response.content)
 
-        except json.JSONDecodeError as e:
-            return None, f"JSON decoding error: {e} - Response text: {response.text[:100]}"
+        except orjson.JSONDecodeError as e:
+            return None, f"JSON decoding error: {e} - Response text: {response.text[:100]}", False, None
 
         if isinstance(response_json, dict):
-            return response_json, None
+            return response_json, None, False, None
         else:
-            return None, "Unexpected response format"
+            return None, "Unexpected response format", False, None
+
+    except requests.exceptions.ConnectionError as e:
+        # 연결 실패(연결 타임아웃 포함)는 장애로 집계
+        _CLOVA_BREAKER.record_failure()
+        return None, f"Connection failed: {e}", True, None
+
+    except requests.exceptions.Timeout as e:
+        # 읽기 타임아웃은 일시적 오류로 보고 백오프 후 재시도
+        _CLOVA_BREAKER.record_timeout()
+        return None, f"Request timed out: {e}", True, None
 
     except requests.exceptions.RequestException as e:
-        return None, f"Request failed: {e}"
\ No newline at end of file
+        _CLOVA_BREAKER.record_failure()
+        return None, f"Request failed: {e}", True, None
+
+def _parse_retry_after(value):
+    """
+    Retry-After 헤더(초 단위) 파싱. 없거나 형식이 다르면 None.
+    """
+    try:
+        return min(float(value), BACKOFF_MAX_DELAY)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt):
+    """
+    지수 백오프 대기 시간 (초): min(BACKOFF_MAX_DELAY, BACKOFF_BASE * 2**attempt) * jitter(0.5~1.5)
+    """
+    return min(BACKOFF_MAX_DELAY, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)